@@ -73,10 +73,19 @@ work on other versions as well.
 ## Top-Level Objects
 '''
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
 import json
+import operator
 from pathlib import Path
+import shutil
+import string
+import struct
 import tempfile
-from typing import Iterable
+import threading
+import time
+from typing import Iterable, Iterator
+import zlib
 
 import platformdirs
 import requests
@@ -86,25 +95,73 @@ from fontfinder.model import TextInfo
 from fontfinder.filters import *
 from fontfinder.model import *
 from fontfinder import _platforms
+from fontfinder import _unicode
 
 
-_REF_DATA_DIR_PATH = Path(__file__, "../data").resolve()
+# Note: These paths are already absolute, and are deliberately not resolve()d or created here, so that importing
+# fontfinder doesn't touch the filesystem. The user data directories are created when first written to.
+
+_REF_DATA_DIR_PATH = Path(__file__).parent / "data"
 '''Path to reference font data (within package)'''
-_REF_DATA_DIR_PATH.mkdir(parents=True, exist_ok=True)
 
 _USER_DATA_DIR_PATH = platformdirs.user_data_path("fontfinder")
 '''Path to user data path for fontfinder (outside of package)'''
-_USER_DATA_DIR_PATH.mkdir(parents=True, exist_ok=True)
 
-_SMALL_UNIHAN_PATH = Path(_REF_DATA_DIR_PATH, "small_unihan.json").resolve()
+_SMALL_UNIHAN_PATH = Path(_REF_DATA_DIR_PATH, "small_unihan.bin")
 '''Path to subset of Unihan data needed for CJK font selection.'''
 
 _SCRIPT_METADATA_URL = "https://raw.githubusercontent.com/unicode-org/cldr-json/main/cldr-json/cldr-core/scriptMetadata.json"
 '''URL of script metadata from the Unicode Common Locale Data Repository (CLDR).'''
 
-_SCRIPT_METADATA_PATH = Path(_REF_DATA_DIR_PATH, "scriptMetadata.json").resolve()
+_SCRIPT_METADATA_PATH = Path(_REF_DATA_DIR_PATH, "scriptMetadata.json")
 '''Path to local copy of script metadata from the Unicode Common Locale Data Repository (CLDR).'''
 
+_GENERIC_SCRIPTS = frozenset(["Common", "Inherited", "Unknown"])
+'''Unicode script values that are shared by many scripts, and so are ignored when choosing a main script.'''
+
+_UNICODE_SCRIPTS = tuple(udp.property_value_aliases['script'].keys())
+'''All script values (property value aliases) in the Unicode standard, in `unicodedataplus` order.'''
+
+_HAN_HINT_SCRIPTS = frozenset(["Hangul", "Hiragana", "Katakana"])
+'''Scripts whose presence alongside Han script indicates Korean or Japanese text.'''
+
+_ASCII_LETTERS = string.ascii_letters.encode("ascii")
+'''The ASCII letters, which are the only ASCII characters whose Unicode script is not `Common`.'''
+
+_TEXT_INFO_CACHE_SIZE = 256
+'''Maximum number of results cached by each instance of `FontFinder.analyse()`.'''
+
+_INSTALLED_FAMILIES_MAX_AGE = 2.0
+'''Max age in seconds of the set of installed families cached for `FontFinder.installed_families()`. It is kept
+short, as the system registers newly installed fonts asynchronously. For the same length of time after
+`FontFinder.install_fonts()` or `FontFinder.uninstall_fonts()`, the set isn't cached at all.'''
+
+_DOWNLOAD_MAX_WORKERS = 8
+'''Maximum number of font files downloaded concurrently by `FontFinder.download_fonts()`.'''
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+'''Size in bytes of each chunk written to disk when downloading font files.'''
+
+_DOWNLOAD_TIMEOUT = 30
+'''Timeout in seconds for each network operation when downloading font files.'''
+
+_HAS_SIMPLIFIED_VARIANT = 1
+'''Flag for a character with a kSimplifiedVariant in the Unihan data. See `FontFinder._small_unihan_data`.'''
+
+_HAS_TRADITIONAL_VARIANT = 2
+'''Flag for a character with a kTraditionalVariant in the Unihan data. See `FontFinder._small_unihan_data`.'''
+
+_small_unihan_data_cache = None
+'''Unihan data loaded from `_SMALL_UNIHAN_PATH`, shared by all FontFinder instances. See
+`FontFinder._small_unihan_data`.'''
+
+_script_metadata_cache = None
+'''Script metadata loaded from `_SCRIPT_METADATA_PATH`, shared by all FontFinder instances.'''
+
+_data_lock = threading.Lock()
+'''Lock ensuring only one thread loads each of the shared data files above.'''
+
+
 # We wait until now to import Noto data so that data path constants above are set.
 from fontfinder import noto 
 
@@ -112,10 +169,18 @@ from fontfinder import noto
 class FontFinder:
     '''Main class for accessing this library's functionality.'''
     def __init__(self):
+        self._font_platform = _platforms.get_font_platform()
         self._all_known_fonts = None
-        self._small_unihan_data_private = None
-        self._script_metadata_private = None
-        
+        self._all_known_fonts_lock = threading.Lock()
+        self._known_font_index_private = None
+        self._text_info_cache = {}
+        self._text_info_cache_lock = threading.Lock()
+        self._known_scripts_cache = None
+        self._scripts_not_known_cache = None
+        self._installed_families_cache = None
+        self._installed_families_cache_time = 0.0
+        self._installed_families_changed_time = None
+
         self.max_analyse_chars: int = 2048
         '''Maximum number of characters examined by `FontFinder.analyse().'''
         
@@ -134,6 +199,9 @@ class FontFinder:
         self.set_prefs()
         self.set_platform_prefs()
 
+        # Start loading the font data now, so the first call that needs it doesn't pay the full cost.
+        noto.prefetch_noto_fonts()
+
     def set_prefs(self) -> None:
         '''Sets the font preferences. See the source code for this method to examine the built-in preferences
         that `fontfinder` uses 'out-of-the-box'. These can be replaced either by overriding this method, or editing
@@ -187,7 +255,7 @@ class FontFinder:
         
         # With a font family, avoid variable fonts, and mono, display and UI fonts. Prefer full builds, and OTF files.
         self.family_font_prefs[ANY_SCRIPT] = [attr_not_in("width",      [FontWidth.VARIABLE]),
-                                              attr_not_in("weight",     [FontWidth.VARIABLE]),
+                                              attr_not_in("weight",     [FontWeight.VARIABLE]),
                                               attr_not_contains("tags", [FontTag.MONO, FontTag.DISPLAY, FontTag.UI]),
                                               attr_in("build",          [FontBuild.FULL]),
                                               attr_in("build",          [FontBuild.HINTED]),
@@ -201,8 +269,7 @@ class FontFinder:
         `_platforms` to examine the built-in platform-specific preferences.
         
         This method is called only after `set_prefs()` has set the platform-independant font preferences.'''
-        font_platform = _platforms.get_font_platform()
-        font_platform.set_platform_prefs(self)       
+        self._font_platform.set_platform_prefs(self)
 
     def analyse(self, text: str) -> TextInfo:
         '''Analyse an initial portion of `text` for the Unicode scripts it uses. Returns a
@@ -239,56 +306,23 @@ class FontFinder:
         - For Japanese:            `ja`
         - For Korean:              `ko`
         '''
-        # Do the counting
-        script_count = Counter()
-        unihan_counter = Counter()
-        emoji_count = 0
-        for char in text[0:min(len(text), self.max_analyse_chars)]:
-            script_count[udp.script(char)] += 1
-            if udp.is_emoji_presentation(char) or udp.is_extended_pictographic(char):
-                emoji_count += 1
-            if char in self._small_unihan_data:
-                for key in self._small_unihan_data[char].keys():
-                    unihan_counter[key] += 1
-        
-        # Determine main_script and script_variant
-        non_generic_count = script_count.copy()
-        generic_scripts = ['Common', 'Inherited', 'Unknown']
-        for generic_script in generic_scripts:
-            del non_generic_count[generic_script]
-
-        if len(non_generic_count) > 0:
-            main_script = non_generic_count.most_common(1)[0][0]
-            script_variant = ""
-        else:
-            main_script = ""
-            script_variant = ""
-
-        # Handle emoji
-        if (len(non_generic_count) == 0 and emoji_count > 0) or \
-           (len(non_generic_count) > 0  and emoji_count > non_generic_count.most_common(1)[0][1]):
-            main_script = "Common"
-            script_variant = "Emoji"
-
-        # Handle Han script
-        if main_script == 'Han':
-            # Han script can be used by Chinese, Japanese and Korean texts
-            if 'Hangul' in script_count:
-                # If Hangul characters are present, assume it's Korean
-                script_variant = 'ko'
-            elif 'Hiragana' in script_count or 'Katakana' in script_count:
-                # If Hirogana or Katakana characters are present, assume it's Japanese
-                script_variant = 'ja'
-            elif unihan_counter['kSimplifiedVariant'] > unihan_counter['kTraditionalVariant']:
-                # Traditional Chinese characters have simplified variants, and vice versa.
-                # So if there are more simplified variants than traditional, we likely have traditional text,
-                # and vice-versa.
-                script_variant = 'zh-Hant-HK' if self.zh_hant_use_hk else 'zh-Hant'
-            else:
-                script_variant = 'zh-Hans'
-
-        return TextInfo(main_script=main_script, script_variant=script_variant, emoji_count=emoji_count,
-                        script_count=script_count)
+        text = text[:self.max_analyse_chars]
+        # Results are cached, as the same text (such as a UI label) is often analysed repeatedly.
+        cache_key = (text, self.zh_hant_use_hk)
+        with self._text_info_cache_lock:
+            text_info = self._text_info_cache.pop(cache_key, None)
+            if text_info is not None:
+                # Re-insert the result to mark it as the most recently used
+                self._text_info_cache[cache_key] = text_info
+        if text_info is None:
+            text_info = self._analyse(text)
+            with self._text_info_cache_lock:
+                self._text_info_cache[cache_key] = text_info
+                if len(self._text_info_cache) > _TEXT_INFO_CACHE_SIZE:
+                    # Discard the least recently used result
+                    del self._text_info_cache[next(iter(self._text_info_cache))]
+        # Return a copy, so that changes made by the caller don't affect the cached result.
+        return dataclasses.replace(text_info, script_count=Counter(text_info.script_count))
 
     def find_families(self, str_or_text_info: str | TextInfo) -> list[str]:
         '''Returns a list of the family names (strings) of all fonts known to the library that are suitable for
@@ -299,8 +333,8 @@ class FontFinder:
         '''
         font_infos = self._text_info_to_font_infos(str_or_text_info)
         # We use a dictionary as a set that preserves insertion order, to return families in their original order.
-        family_names = {font_info.family_name: 1 for font_info in font_infos}
-        return list(family_names.keys())
+        family_names = dict.fromkeys(font_info.family_name for font_info in font_infos)
+        return list(family_names)
 
     def find_family(self, str_or_text_info: str | TextInfo) -> str | None:
         '''Returns the family name (a string) of the preferred font family for `str_or_text_info`.
@@ -313,9 +347,10 @@ class FontFinder:
         font_infos = self._text_info_to_font_infos(str_or_text_info)
         if len(font_infos) == 0:
             return None
-        count_func = lambda font_infos: len({font_info.family_name for font_info in font_infos})
+        # We're choosing between families, so we count distinct family names.
+        count_key = lambda font_info: font_info.family_name
         font_infos = self._apply_pref_dict(font_infos[0].main_script, font_infos[0].script_variant,
-                                           self.family_prefs, count_func, font_infos)
+                                           self.family_prefs, count_key, font_infos)
         family_name = font_infos[0].family_name
         return family_name
 
@@ -336,7 +371,7 @@ class FontFinder:
         
         result_font_infos = []
         for family_name in family_names:
-            font_infos = self.known_fonts(lambda font_info: font_info.family_name == family_name)
+            font_infos = self._known_fonts_in_family(family_name)
             if len(font_infos) == 0:
                 continue
             # font_infos can be duplicated under multiple script variants. If no script and variant is specified, we
@@ -349,11 +384,8 @@ class FontFinder:
                 family_script_variant = font_infos[0].script_variant
             else:
                 family_script_variant = script_variant
-            font_infos = [font_info for font_info in font_infos if font_info.main_script == family_main_script and \
-                                                                font_info.script_variant == family_script_variant]
-            count_func = len
-            font_infos = self._apply_pref_dict(main_script, script_variant, self.family_font_prefs, count_func,
-                                            font_infos)
+            font_infos = self._known_fonts_in_family_for(family_name, family_main_script, family_script_variant)
+            font_infos = self._apply_pref_dict(main_script, script_variant, self.family_font_prefs, None, font_infos)
             result_font_infos.extend(font_infos)
         return result_font_infos
 
@@ -371,6 +403,9 @@ class FontFinder:
         Some font families match several Unicode scripts. In these cases, `main_script` and `script_variant`
         can optionally be specified, to ensure these fields have the correct value in the resulting `FontInfo` list.
         Otherwise, `main_script` and `script_variant` will have the first values found within the given font families.
+
+        Installed families are found using `not_installed_families()`, so fonts installed by other means in the
+        last 2 seconds may not be seen.
         '''
         family_names = self.not_installed_families(family_name_or_names)
         font_infos = self.find_family_fonts(family_names, main_script, script_variant)
@@ -382,29 +417,51 @@ class FontFinder:
         to `download_dir`. Returns a list of copied `FontInfo` objects where the `downloaded_path` attribute points
         to each new file.'''
         download_dir = Path(download_dir)
-        font_infos = self.downloadable_fonts([font_info.copy() for font_info in font_infos])
-        for font_info in font_infos:
-            response = requests.get(font_info.url, stream=True)
-            font_info.downloaded_path = download_dir / font_info.filename
-            with open(font_info.downloaded_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=128):
-                    file.write(chunk)
+        # Only downloadable fonts are copied, and dataclasses.replace() makes a shallow copy with the new path,
+        # which is all we need.
+        font_infos = [dataclasses.replace(font_info, downloaded_path=download_dir / font_info.filename)
+                      for font_info in self.downloadable_fonts(font_infos)]
+        # A single session lets the downloads reuse pooled (keep-alive) connections.
+        with requests.Session() as session:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=2 * _DOWNLOAD_MAX_WORKERS,
+                                                    pool_maxsize=2 * _DOWNLOAD_MAX_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            # Downloads are network-bound, so we run them concurrently.
+            with ThreadPoolExecutor(max_workers=_DOWNLOAD_MAX_WORKERS) as executor:
+                # Consuming the results re-raises any exception from a download.
+                list(executor.map(lambda font_info: self._download_font(session, font_info), font_infos))
         return font_infos
 
+    def _download_font(self, session: requests.Session, font_info: FontInfo) -> None:
+        '''Downloads a single font file from its `url` to its `downloaded_path`, using `session`.'''
+        with session.get(font_info.url, stream=True, timeout=_DOWNLOAD_TIMEOUT) as response:
+            # Don't save an error page as if it were the font file.
+            response.raise_for_status()
+            # Copy the raw stream straight to disk, avoiding the per-chunk generator overhead of iter_content().
+            # Setting decode_content still undoes any Content-Encoding, as iter_content() would.
+            response.raw.decode_content = True
+            # We already write in large chunks, so the file is unbuffered to avoid an extra copy through a buffer.
+            with open(font_info.downloaded_path, 'wb', buffering=0) as file:
+                shutil.copyfileobj(response.raw, file, length=_DOWNLOAD_CHUNK_SIZE)
+
     def install_fonts(self, font_infos: Iterable[FontInfo]) -> None:
         '''Install the font files in `font_infos`. The `downloaded_path` of each `FontInfo` must point to the
         actual font file in the filesystem.
         
-        Font are installed to the user font collection, rather than the system-wide font collection.'''
-        font_platform = _platforms.get_font_platform()
-        font_platform.install_fonts(font_infos)        
+        Font are installed to the user font collection, rather than the system-wide font collection.
+
+        This clears the set of installed families cached for `installed_families()`.'''
+        self._font_platform.install_fonts(font_infos)
+        self._installed_families_changed()
      
     def uninstall_fonts(self, font_infos: Iterable[FontInfo]) -> None:
         '''Uninstall the font files in `font_infos`. The fonts must exist in the user font collection, otherwise they
         will not be uninstalled.
-        '''
-        font_platform = _platforms.get_font_platform()
-        font_platform.uninstall_fonts(font_infos)        
+
+        This clears the set of installed families cached for `installed_families()`.'''
+        self._font_platform.uninstall_fonts(font_infos)
+        self._installed_families_changed()
 
     def is_rtl(self, script_or_text_info: str | TextInfo) -> bool:
         '''Returns True if the text direction of the given Unicode script is right-to-left, otherwise False.
@@ -427,56 +484,95 @@ class FontFinder:
         '''Returns a list of FontInfo objects for all fonts known to this library.
         
         This is a large list, which is cached in memory the first time the method is called.'''
+        return list(self.iter_known_fonts(filter_func))
+
+    def iter_known_fonts(self, filter_func = None) -> Iterator[FontInfo]:
+        '''Returns an iterator over the FontInfo objects for all fonts known to this library, in the same order as
+        `known_fonts()`. If `filter_func` is given, only the FontInfo objects for which it returns True are
+        included.
+        
+        Unlike `known_fonts()`, this doesn't build a new list, and `filter_func` is only called as the iterator is
+        consumed, which is useful when only the first few results are needed.'''
         # Even though noto.get_noto_fonts() can filter on the fly, for now we choose to optimise for speed, rather
         # than memory, by caching the full list of font_infos in memory.
-        if self._all_known_fonts is None:
-            self._all_known_fonts = []
-            self._all_known_fonts.extend(noto.get_noto_fonts())
-            font_platform = _platforms.get_font_platform()
-            self._all_known_fonts.extend(font_platform.known_platform_fonts())
-
-        return [font_info for font_info in self._all_known_fonts if (filter_func is None or filter_func(font_info))]
+        with self._all_known_fonts_lock:
+            if self._all_known_fonts is None:
+                all_known_fonts = []
+                all_known_fonts.extend(noto.get_noto_fonts())
+                all_known_fonts.extend(self._font_platform.known_platform_fonts())
+                # Only publish the list once complete, so other threads never see a partial list.
+                self._all_known_fonts = all_known_fonts
+
+        if filter_func is None:
+            return iter(self._all_known_fonts)
+        return filter(filter_func, self._all_known_fonts)
 
     def known_scripts(self, filter_func = None) -> list[str]:
-        '''Returns a list of the `main_script` values for all the fonts known to this library.'''
-        return sorted(set([info.main_script for info in self.known_fonts(filter_func)]))
+        '''Returns a list of the `main_script` values for all the fonts known to this library.
+        
+        Without a `filter_func`, the result only depends on the known fonts, so it is cached after the first call.'''
+        if filter_func is not None:
+            return sorted({info.main_script for info in self.known_fonts(filter_func)})
+        if self._known_scripts_cache is None:
+            self._known_scripts_cache = sorted({info.main_script for info in self.known_fonts()})
+        return list(self._known_scripts_cache)
 
     def known_script_variants(self, filter_func = None) -> list[(str, str)]:
         '''Returns a list of `(main_script, script_variant)` tuples for all the fonts known to this library.'''
+        if filter_func is None:
+            # The known font index is keyed by these tuples, in the order they first appear in the known fonts.
+            return list(self._known_font_index[0])
         # Use a dictionary as an ordered set
-        return list({(info.main_script, info.script_variant): 1 for info in self.known_fonts(filter_func)}.keys())
+        return list(dict.fromkeys((info.main_script, info.script_variant) for info in self.known_fonts(filter_func)))
 
     def all_unicode_scripts(self) -> list[str]:
         '''Returns a list of all script values (property value aliases) in the Unicode standard.'''
-        return list(udp.property_value_aliases['script'].keys())
+        return list(_UNICODE_SCRIPTS)
 
     def scripts_not_known(self) -> list[str]:
-        '''Returns a list of all the Unicode script values not supported by the fonts known to this library.'''
-        return sorted(set(self.all_unicode_scripts()) - set(self.known_scripts()) -
-                      set(["Common", "Inherited", "Unknown"]))
+        '''Returns a list of all the Unicode script values not supported by the fonts known to this library.
+        The result is cached after the first call.'''
+        if self._scripts_not_known_cache is None:
+            known_scripts = {info.main_script for info in self.known_fonts()}
+            self._scripts_not_known_cache = tuple(sorted(script for script in _UNICODE_SCRIPTS
+                                                         if script not in known_scripts and
+                                                         script not in _GENERIC_SCRIPTS))
+        return list(self._scripts_not_known_cache)
 
     def all_installed_families(self) -> list[str]:
         '''Returns a list of the family names of all fonts currently installed on the system.
+
+        This always queries the system, and also refreshes the set of installed families cached for
+        `installed_families()` and `not_installed_families()`.
         '''
-        font_platform = _platforms.get_font_platform()
-        return font_platform.all_installed_families()        
+        all_installed_families = self._font_platform.all_installed_families()
+        self._installed_families_cache = set(all_installed_families)
+        self._installed_families_cache_time = time.monotonic()
+        return all_installed_families
 
     def installed_families(self, family_name_or_names: str | Iterable[str]) -> list[str]:
         '''For a given font family name or iterable of names, return a filtered list containing just those
-        families that are currently installed on the system.'''
+        families that are currently installed on the system.
+        
+        The set of installed families is cached for up to 2 seconds (`_INSTALLED_FAMILIES_MAX_AGE`), so fonts
+        installed by other means may take that long to be seen. Call `all_installed_families()` to refresh it straight
+        away. `install_fonts()` and `uninstall_fonts()` clear it, and for 2 seconds afterwards, while the system
+        registers the change, every call queries the system.'''
         family_names = family_name_or_names
         if isinstance(family_names, str):
             family_names = [family_names]
-        all_installed_families = set(self.all_installed_families())
+        all_installed_families = self._installed_families
         return [family_name for family_name in family_names if family_name in all_installed_families]
 
     def not_installed_families(self, family_name_or_names: str | Iterable[str]) -> list[str]:
         '''For a given font family name or iterable of names, return a filtered list containing just those
-        families that are not currently installed on the system.'''
+        families that are not currently installed on the system.
+        
+        The set of installed families is cached for up to 2 seconds, as for `installed_families()`.'''
         family_names = family_name_or_names
         if isinstance(family_names, str):
             family_names = [family_names]
-        all_installed_families = set(self.all_installed_families())
+        all_installed_families = self._installed_families
         return [family_name for family_name in family_names if family_name not in all_installed_families]
 
     def downloadable_fonts(self, font_infos: Iterable[FontInfo]) -> list[FontInfo]:
@@ -484,54 +580,215 @@ class FontFinder:
         have download URLs provided.'''
         return [font_info for font_info in font_infos if font_info.url is not None and font_info.url != ""]
 
+    @classmethod
+    def clear_cache(cls) -> None:
+        '''Discards the data shared by all `FontFinder` instances in this process, so that it is loaded again when
+        next needed.
+
+        The data shared between instances is read-only: the Noto font records (which each instance receives its own
+        copies of), the small Unihan data used by `analyse()`, and the script metadata used by `is_rtl()`. The
+        Unicode property tables used by `analyse()` are also shared, but are derived from `unicodedataplus` and so
+        are never discarded.
+
+        Everything else belongs to each instance and is not affected: its list of known fonts (and the indexes and
+        script lists built from it), its cached `analyse()` results, its cached set of installed families, and its
+        preferences. So this mainly affects instances created afterwards.'''
+        global _small_unihan_data_cache, _script_metadata_cache
+        with _data_lock:
+            _small_unihan_data_cache = None
+            _script_metadata_cache = None
+        noto.clear_noto_fonts()
+
+    def _analyse(self, text):
+        '''Does the work of `analyse()`, for `text` that has already been truncated to `max_analyse_chars`.'''
+        if text.isascii():
+            # ASCII fast path. ASCII letters are Latin, all other ASCII characters are Common, and none are emoji,
+            # so we just need to count the letters, which bytes.translate() does in C.
+            common_count = len(text.encode("ascii").translate(None, _ASCII_LETTERS))
+            latin_count = len(text) - common_count
+            # Keep the scripts in order of first appearance, as below.
+            script_counts = [("Latin", latin_count), ("Common", common_count)]
+            if not text[:1].isalpha():
+                script_counts.reverse()
+            script_count = Counter({script: count for script, count in script_counts if count > 0})
+            return TextInfo(main_script="Latin" if latin_count > 0 else "", script_variant="", emoji_count=0,
+                            script_count=script_count)
+
+        # Do the counting. Real text reuses a small set of characters, so we count each distinct character first
+        # (Counter does this in C), and then only look up the Unicode properties once per distinct character.
+        char_count = Counter(text)
+        script_count, emoji_count = _unicode.count_properties(char_count)
+        
+        # Determine main_script and script_variant
+        # We only need the most common non-generic script, so a single max() pass is enough. Like
+        # Counter.most_common(1), max() returns the first script found if several have the top count.
+        main_script, main_script_count = max(((script, count) for script, count in script_count.items()
+                                              if script not in _GENERIC_SCRIPTS),
+                                             key=operator.itemgetter(1), default=("", 0))
+        script_variant = ""
+
+        # Handle emoji
+        if emoji_count > main_script_count:
+            main_script = "Common"
+            script_variant = "Emoji"
+
+        # Handle Han script
+        if main_script == 'Han':
+            # Han script can be used by Chinese, Japanese and Korean texts
+            hint_scripts = script_count.keys() & _HAN_HINT_SCRIPTS
+            if 'Hangul' in hint_scripts:
+                # If Hangul characters are present, assume it's Korean
+                script_variant = 'ko'
+            elif len(hint_scripts) > 0:
+                # If Hirogana or Katakana characters are present, assume it's Japanese
+                script_variant = 'ja'
+            else:
+                # Traditional Chinese characters have simplified variants, and vice versa.
+                # So if there are more simplified variants than traditional, we likely have traditional text,
+                # and vice-versa. All of these characters are Han, so they're only counted once we know we
+                # need them.
+                unihan_flags, first_codepoint = self._small_unihan_data
+                simplified_variant_count = 0
+                traditional_variant_count = 0
+                for char, count in char_count.items():
+                    index = ord(char) - first_codepoint
+                    if 0 <= index < len(unihan_flags):
+                        flags = unihan_flags[index]
+                        if flags & _HAS_SIMPLIFIED_VARIANT:
+                            simplified_variant_count += count
+                        if flags & _HAS_TRADITIONAL_VARIANT:
+                            traditional_variant_count += count
+                if simplified_variant_count > traditional_variant_count:
+                    script_variant = 'zh-Hant-HK' if self.zh_hant_use_hk else 'zh-Hant'
+                else:
+                    script_variant = 'zh-Hans'
+
+        return TextInfo(main_script=main_script, script_variant=script_variant, emoji_count=emoji_count,
+                        script_count=script_count)
+
     @property
     def _small_unihan_data(self):
-        if self._small_unihan_data_private is None:
-            with open(_SMALL_UNIHAN_PATH, "r", encoding="utf-8") as small_unihan_file:
-                self._small_unihan_data_private = json.load(small_unihan_file)
-        return self._small_unihan_data_private
+        '''A tuple of `(unihan_flags, first_codepoint)`. `unihan_flags` is a `bytes` object with one byte for each
+        codepoint from `first_codepoint` up to the last codepoint with a simplified or traditional variant. Each byte
+        is a combination of the `_HAS_SIMPLIFIED_VARIANT` and `_HAS_TRADITIONAL_VARIANT` flags. This is around a
+        tenth of the memory of sets of the characters.
+        
+        The data file stores `first_codepoint` as a little-endian 32-bit integer, followed by the zlib-compressed
+        `unihan_flags` (see `_generate_ref_data.py`), so loading it needs no parsing.'''
+        global _small_unihan_data_cache
+        if _small_unihan_data_cache is None:
+            with _data_lock:
+                if _small_unihan_data_cache is None:
+                    with open(_SMALL_UNIHAN_PATH, "rb") as small_unihan_file:
+                        small_unihan = small_unihan_file.read()
+                    (first_codepoint,) = struct.unpack_from("<I", small_unihan)
+                    unihan_flags = zlib.decompress(small_unihan[struct.calcsize("<I"):])
+                    _small_unihan_data_cache = (unihan_flags, first_codepoint)
+        return _small_unihan_data_cache
+
+    @property
+    def _installed_families(self):
+        '''The cached set of installed family names. See `installed_families()`.'''
+        now = time.monotonic()
+        if (self._installed_families_cache is None or
+            now - self._installed_families_cache_time >= _INSTALLED_FAMILIES_MAX_AGE or
+            (self._installed_families_changed_time is not None and
+             now - self._installed_families_changed_time < _INSTALLED_FAMILIES_MAX_AGE)):
+            self.all_installed_families()
+        return self._installed_families_cache
+
+    def _installed_families_changed(self):
+        '''Clears the cached set of installed family names after fonts are installed or uninstalled, and stops it
+        being reused while the system registers the change.'''
+        self._installed_families_cache = None
+        self._installed_families_changed_time = time.monotonic()
+
+    @property
+    def _known_font_index(self):
+        '''A tuple of three dictionaries indexing the known fonts. The first maps `(main_script, script_variant)`
+        tuples to lists of `FontInfo`s, the second maps family names to lists of `FontInfo`s, and the third maps
+        `(family_name, main_script, script_variant)` tuples to lists of `FontInfo`s. Each list preserves the order of
+        `known_fonts()`.'''
+        if self._known_font_index_private is None:
+            by_script_variant = {}
+            by_family = {}
+            by_family_script_variant = {}
+            for font_info in self.known_fonts():
+                by_script_variant.setdefault((font_info.main_script, font_info.script_variant), []).append(font_info)
+                by_family.setdefault(font_info.family_name, []).append(font_info)
+                by_family_script_variant.setdefault((font_info.family_name, font_info.main_script,
+                                                     font_info.script_variant), []).append(font_info)
+            self._known_font_index_private = (by_script_variant, by_family, by_family_script_variant)
+        return self._known_font_index_private
+
+    def _known_fonts_for(self, main_script, script_variant):
+        '''Returns the known fonts with the given `main_script` and `script_variant`. The returned list is shared
+        with the index, so callers must not modify it.'''
+        return self._known_font_index[0].get((main_script, script_variant), [])
+
+    def _known_fonts_in_family(self, family_name):
+        '''Returns the known fonts with the given `family_name`. The returned list is shared with the index, so
+        callers must not modify it.'''
+        return self._known_font_index[1].get(family_name, [])
+
+    def _known_fonts_in_family_for(self, family_name, main_script, script_variant):
+        '''Returns the known fonts with the given `family_name`, `main_script` and `script_variant`. The returned list
+        is shared with the index, so callers must not modify it.'''
+        return self._known_font_index[2].get((family_name, main_script, script_variant), [])
 
     @property
     def _script_metadata(self):
-        if self._script_metadata_private is None:
-            with open(_SCRIPT_METADATA_PATH, "r", encoding="utf-8") as script_metadata_file:
-                self._script_metadata_private = json.load(script_metadata_file)["scriptMetadata"]
-        return self._script_metadata_private
+        global _script_metadata_cache
+        if _script_metadata_cache is None:
+            with _data_lock:
+                if _script_metadata_cache is None:
+                    with open(_SCRIPT_METADATA_PATH, "r", encoding="utf-8") as script_metadata_file:
+                        _script_metadata_cache = json.load(script_metadata_file)["scriptMetadata"]
+        return _script_metadata_cache
 
     def _text_info_to_font_infos(self, str_or_text_info):
         if isinstance(str_or_text_info, str):
             text_info = self.analyse(str_or_text_info)
         else:
             text_info = str_or_text_info
-        font_infos = self.known_fonts(lambda font_info: font_info.main_script == text_info.main_script and \
-                                                        font_info.script_variant == text_info.script_variant)
-        return font_infos
-
-    def _apply_pref_dict(self, main_script, script_variant, pref_dict, count_func, font_infos):
+        return self._known_fonts_for(text_info.main_script, text_info.script_variant)
+
+    def _apply_pref_dict(self, main_script, script_variant, pref_dict, count_key, font_infos):
+        '''Applies the preferences in `pref_dict` to `font_infos`. `count_key` is a function returning the value
+        that distinguishes the choices being made (e.g. the family name), or None if each font is its own choice.'''
+        if self._count_choices(font_infos, count_key) < 2:
+            # There's nothing to choose between, so we don't need to look up any preferences.
+            return font_infos
         # Preferences for particular scripts are applied before preferences for any script
         pref_keys = [(main_script, script_variant), ANY_SCRIPT]
         for pref_key in pref_keys:
             if pref_key in pref_dict:
-                font_infos = self._apply_pref_filters(pref_dict[pref_key], count_func, font_infos)
+                font_infos = self._apply_pref_filters(pref_dict[pref_key], count_key, font_infos)
         return font_infos
 
-    def _apply_pref_filters(self, filter_funcs, count_func, font_infos):
+    @staticmethod
+    def _count_choices(font_infos, count_key):
+        '''Returns the number of distinct choices in `font_infos`, capped at 2. Preference filtering only needs to
+        distinguish 0, 1 or many choices, so we stop counting as soon as a second distinct choice is found.'''
+        if count_key is None:
+            return min(len(font_infos), 2)
+        keys = set()
+        for font_info in font_infos:
+            keys.add(count_key(font_info))
+            if len(keys) == 2:
+                break
+        return len(keys)
+
+    def _apply_pref_filters(self, filter_funcs, count_key, font_infos):
         cur_list = font_infos
-        count = count_func(cur_list)
-        # print(f"Initial ({count})")
-        # print([info.url for info in font_infos])
-        # print()
+        count = self._count_choices(cur_list, count_key)
         if count < 2 or len(filter_funcs) == 0:
             # We actually don't need to filter.
             return cur_list
 
-        # print("After each filter func")
         for filter_func in filter_funcs:
             new_list = [font_info for font_info in cur_list if filter_func(font_info)]
-            count = count_func(new_list)
-            # print(count)
-            # print([info.url for info in new_list])
-            # print()
+            count = self._count_choices(new_list, count_key)
             if count == 0:
                 # This preference was too restrictive, so we ignore it by not updating cur_list
                 pass
@@ -5,7 +5,9 @@ This script is only used during development, and not by users of fontfinder.
 '''
 import json
 from pathlib import Path
+import struct
 import tempfile
+import zlib
 
 import requests
 
@@ -41,17 +43,28 @@ def generate_small_unihan():
             packager.export()
 
         with open(full_unihan_path) as full_unihan_file:
-            with open(fontfinder._SMALL_UNIHAN_PATH, "w", encoding="utf-8") as small_unihan_file:
-                full_records = json.load(full_unihan_file)
-                selected_keys = ['kTraditionalVariant', 'kSimplifiedVariant']
-                small_records = {}
-                for full_record in full_records:
-                    small_entry = {key: value for key, value in full_record.items() if key in selected_keys}
-                    if len(small_entry) > 0:
-                        small_records[full_record['char']] = small_entry
-                json.dump(small_records, small_unihan_file)
-                print(f"Save small Unihan data to {fontfinder._SMALL_UNIHAN_PATH}")
-        
+            full_records = json.load(full_unihan_file)
+        # fontfinder only needs to know which characters have each of these properties.
+        simplified_chars = [record['char'] for record in full_records if 'kSimplifiedVariant' in record]
+        traditional_chars = [record['char'] for record in full_records if 'kTraditionalVariant' in record]
+        write_small_unihan(simplified_chars, traditional_chars)
+
+def write_small_unihan(simplified_chars, traditional_chars):
+    '''Writes the small Unihan data file for the characters that have a simplified and a traditional variant
+    respectively. See `FontFinder._small_unihan_data` for the format.'''
+    flag_chars = [(fontfinder._HAS_SIMPLIFIED_VARIANT, simplified_chars),
+                  (fontfinder._HAS_TRADITIONAL_VARIANT, traditional_chars)]
+    codepoints = [ord(char) for _, chars in flag_chars for char in chars]
+    first_codepoint = min(codepoints)
+    unihan_flags = bytearray(max(codepoints) - first_codepoint + 1)
+    for flag, chars in flag_chars:
+        for char in chars:
+            unihan_flags[ord(char) - first_codepoint] |= flag
+    with open(fontfinder._SMALL_UNIHAN_PATH, "wb") as small_unihan_file:
+        small_unihan_file.write(struct.pack("<I", first_codepoint))
+        small_unihan_file.write(zlib.compress(unihan_flags, 9))
+    print(f"Save small Unihan data to {fontfinder._SMALL_UNIHAN_PATH}")
+
 
 if __name__ == '__main__':
     download_noto_ref_data()
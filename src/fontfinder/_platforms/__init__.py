@@ -1,6 +1,6 @@
 from ctypes import CFUNCTYPE
 import ctypes.util
-import platform
+import sys
 from typing import Iterable
 
 import fontfinder
@@ -84,10 +84,10 @@ class FontPlatform:
 
 
 def get_font_platform():
-    if platform.system() == "Darwin":
+    if sys.platform == "darwin":
         import fontfinder._platforms.mac
         return fontfinder._platforms.mac.MacPlatform()
-    elif platform.system() == "Windows":
+    elif sys.platform == "win32":
         import fontfinder._platforms.windows
         return fontfinder._platforms.windows.WindowsPlatform()
     else:
@@ -3,8 +3,9 @@
 #
 # See ACKNOWLEDGEMENTS file.
 #
-import platform
-if platform.system() == "Darwin":
+import sys
+if sys.platform == "darwin":
+    import platform
     from ctypes import c_bool, c_char_p, c_long, c_uint32, c_void_p, create_string_buffer
     import ctypes.util
     from pathlib import Path
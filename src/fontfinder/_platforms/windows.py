@@ -3,8 +3,8 @@
 #
 # See ACKNOWLEDGEMENTS file.
 #
-import platform
-if platform.system() == "Windows":
+import sys
+if sys.platform == "win32":
     import comtypes
     from comtypes import COMError, GUID, HRESULT, IUnknown, STDMETHOD, WINFUNCTYPE
     from sys import getwindowsversion
@@ -24,6 +24,8 @@ if platform.system() == "Windows":
     USER_FONT_DIR = Path("~\\AppData\\Local\\Microsoft\\Windows\\Fonts").expanduser()
     USER_FONT_REG_PATH = "Software\\Microsoft\\Windows NT\\CurrentVersion\\Fonts"
 
+    _NAME_BUFFER_SIZE = 256 # Initial size (in characters) of the buffer for reading family names
+
 
     class WindowsPlatform(fontfinder._platforms.FontPlatform):
         def all_installed_families(self):
@@ -36,6 +38,9 @@ if platform.system() == "Windows":
 
             # Use a dict as an ordered set
             family_names = {}
+            # Reuse one name buffer for all families, only replacing it when a longer name needs more room.
+            name_buffer = ctypes.create_unicode_buffer(_NAME_BUFFER_SIZE)
+            name_len = ctypes.c_uint32()
             for i in range(fonts.GetFontFamilyCount()):
                 font_family = POINTER(IDWriteFontFamily)()
                 fonts.GetFontFamily(i, byref(font_family))
@@ -44,10 +49,10 @@ if platform.system() == "Windows":
                 font_family.GetFamilyNames(byref(family_name_strings))
 
                 name_index = 0
-                name_len = ctypes.c_uint32()
                 family_name_strings.GetStringLength(name_index, byref(name_len))
 
-                name_buffer = ctypes.create_unicode_buffer(name_len.value+1)
+                if name_len.value+1 > len(name_buffer):
+                    name_buffer = ctypes.create_unicode_buffer(name_len.value+1)
                 family_name_strings.GetString(name_index, name_buffer, name_len.value+1)
                 family_names[name_buffer.value] = 1
             return list(family_names.keys())
@@ -0,0 +1,88 @@
+'''
+Fast lookup of the per-character Unicode properties used by `FontFinder.analyse()`.
+
+Properties are stored in two-stage tables, as is usual for Unicode property data. The first stage is indexed by the
+high bits of a codepoint (`cp >> 8`), and gives a block covering 256 codepoints, which is then indexed by the low byte
+of the codepoint. Script blocks are `bytes` of small integer script ids, and emoji blocks are 256-bit integers.
+
+Rather than computing the whole table up front, each block is filled from `unicodedataplus` the first time a
+character in it is looked up. Text rarely uses more than a few blocks, so this costs a few hundred property lookups
+per block, once per process.
+'''
+import sys
+import threading
+from collections import Counter
+from typing import Mapping
+
+import unicodedataplus as udp
+
+
+_BLOCK_SHIFT = 8
+_BLOCK_SIZE = 1 << _BLOCK_SHIFT
+_BLOCK_MASK = _BLOCK_SIZE - 1
+_NUM_BLOCKS = (sys.maxunicode + 1) >> _BLOCK_SHIFT
+
+_script_names = []
+'''Script names, indexed by script id.'''
+
+_script_ids = {}
+'''Script ids, keyed by script name.'''
+
+_script_blocks = [None] * _NUM_BLOCKS
+'''Stage 1 of the script table. Each entry is None until filled, then a `bytes` block of script ids.'''
+
+_emoji_blocks = [None] * _NUM_BLOCKS
+'''Stage 1 of the emoji table. Each entry is None until filled, then an int whose bit `n` is set if the
+codepoint at offset `n` in the block has the Emoji Presentation or Extended_Pictographic property.'''
+
+_fill_lock = threading.Lock()
+'''Lock ensuring script ids are assigned consistently when blocks are filled from multiple threads.'''
+
+
+def count_properties(char_count: Mapping[str, int]) -> tuple[Counter, int]:
+    '''Given a mapping of characters to their counts, returns a tuple of a `Counter` of the counts of each script
+    (in order of first appearance), and the count of emoji characters. Scripts are as given by `udp.script()`, and
+    emoji are characters with either the Emoji Presentation or Extended_Pictographic property.
+
+    Script ids rather than script names are tallied, and only converted to names at the end.'''
+    script_blocks = _script_blocks
+    emoji_blocks = _emoji_blocks
+    id_count = {}
+    emoji_count = 0
+    for char, count in char_count.items():
+        cp = ord(char)
+        block_num = cp >> _BLOCK_SHIFT
+        script_block = script_blocks[block_num]
+        if script_block is None:
+            _fill_block(block_num)
+            script_block = script_blocks[block_num]
+        offset = cp & _BLOCK_MASK
+        script_id = script_block[offset]
+        id_count[script_id] = id_count.get(script_id, 0) + count
+        if (emoji_blocks[block_num] >> offset) & 1:
+            emoji_count += count
+    script_names = _script_names
+    return Counter({script_names[script_id]: count for script_id, count in id_count.items()}), emoji_count
+
+def _fill_block(block_num: int) -> None:
+    '''Computes and stores the script and emoji blocks for block number `block_num`.'''
+    with _fill_lock:
+        if _script_blocks[block_num] is not None:
+            return
+        script_ids = bytearray(_BLOCK_SIZE)
+        emoji_bits = 0
+        first_cp = block_num << _BLOCK_SHIFT
+        for offset in range(_BLOCK_SIZE):
+            char = chr(first_cp + offset)
+            script = udp.script(char)
+            script_id = _script_ids.get(script)
+            if script_id is None:
+                script_id = len(_script_names)
+                _script_names.append(script)
+                _script_ids[script] = script_id
+            script_ids[offset] = script_id
+            if udp.is_emoji_presentation(char) or udp.is_extended_pictographic(char):
+                emoji_bits |= 1 << offset
+        # Set the emoji block first, as the script block is the one checked to see if the block is filled.
+        _emoji_blocks[block_num] = emoji_bits
+        _script_blocks[block_num] = bytes(script_ids)
@@ -2,53 +2,69 @@
 Useful filter factories for expressing font preferences for `FontFinder.family_prefs` and
 `FontFinder.family_font_prefs`.
 '''
+import operator
+
 
 def attr_in(attr_name, collection):
     '''A filter factory. Returns a filter function that takes a single argument `obj` and returns True
     if `obj.attr_name` is in `collection`, else False.
     '''
+    get_attr = operator.attrgetter(attr_name)
     def filter(obj):
-        return getattr(obj, attr_name) in collection
+        return get_attr(obj) in collection
     return filter
 
 def attr_not_in(attr_name, collection):
     '''A filter factory. Returns a filter function that takes a single argument `obj` and returns True
     if `obj.attr_name` is not in `collection`, else False.
     '''
+    get_attr = operator.attrgetter(attr_name)
     def filter(obj):
-        return getattr(obj, attr_name) not in collection
+        return get_attr(obj) not in collection
     return filter
 
 def attr_contains(attr_name, collection):
     '''A filter factory. Returns a filter function that takes a single argument `obj` and returns True
     if any of the items in `collection` are in `obj.attr_name`. Otherwise returns False.
     '''
+    get_attr = operator.attrgetter(attr_name)
     def filter(obj):
-        return any(map(lambda item: item in getattr(obj, attr_name), collection))
+        value = get_attr(obj)
+        return any(item in value for item in collection)
     return filter
 
 def attr_not_contains(attr_name, collection):
     '''A filter factory. Returns a filter function that takes a single argument `obj` and returns True
     if none of the items in `collection` are in `obj.attr_name`. Otherwise returns False.
     '''
+    get_attr = operator.attrgetter(attr_name)
     def filter(obj):
-        return not any(map(lambda item: item in getattr(obj, attr_name), collection))
+        value = get_attr(obj)
+        return not any(item in value for item in collection)
     return filter
 
 def attr_contains_str(attr_name, str_collection):
     '''A filter factory. Returns a filter function that takes a single argument `obj` and returns True
     if any of the strings in `str_collection` are in the string conversion of `obj.attr_name`, when all strings are
-    casefolded. Otherwise returns False.
+    casefolded. Otherwise returns False. The strings in `str_collection` are casefolded once, when the filter
+    function is created.
     '''
+    get_attr = operator.attrgetter(attr_name)
+    folded_strs = tuple(s.casefold() for s in str_collection)
     def filter(obj):
-        return any(map(lambda s: s.casefold() in str(getattr(obj, attr_name)).casefold(), str_collection))
+        value = str(get_attr(obj)).casefold()
+        return any(s in value for s in folded_strs)
     return filter
 
 def attr_not_contains_str(attr_name, str_collection):
     '''A filter factory. Returns a filter function that takes a single argument `obj` and returns True
     if none of the strings in `str_collection` are in the string conversion of `obj.attr_name`, when all strings are
-    casefolded. Otherwise returns False.
+    casefolded. Otherwise returns False. The strings in `str_collection` are casefolded once, when the filter
+    function is created.
     '''
+    get_attr = operator.attrgetter(attr_name)
+    folded_strs = tuple(s.casefold() for s in str_collection)
     def filter(obj):
-        return not any(map(lambda s: s.casefold() in str(getattr(obj, attr_name).casefold()), str_collection))
+        value = str(get_attr(obj)).casefold()
+        return not any(s in value for s in folded_strs)
     return filter
@@ -8,6 +8,7 @@ import functools
 from enum import Enum, Flag, auto
 from pathlib import Path, PurePosixPath
 import re
+import sys
 from urllib.parse import urlparse
 
 
@@ -33,7 +34,7 @@ class TextInfo:
     of each Unicode script in the text. The keys are the string names of each script that appears in the text.'''
 
 
-@dataclasses.dataclass(order=True)
+@dataclasses.dataclass(order=True, slots=True)
 class FontInfo:
     '''Stores fonta metadata about an individual font file.'''
 
@@ -120,21 +121,26 @@ class FontInfo:
             self.subfamily_name = FontWeight.REGULAR.text
             self.postscript_name += "-" + FontWeight.REGULAR.text
         
-        if "/slim".casefold() in url_path.casefold():
+        folded_postscript_name = self.postscript_name.casefold()
+        if "/slim" in url_path.casefold():
             self.tags |= FontTag.SLIM
-        if "Mono".casefold() in self.postscript_name.casefold():
+        if "mono" in folded_postscript_name:
             self.tags |= FontTag.MONO
         if "UI" in self.postscript_name:
             self.tags |= FontTag.UI
-        if "Display".casefold() in self.postscript_name.casefold():
+        if "display" in folded_postscript_name:
             self.tags |= FontTag.DISPLAY
-        if "Looped".casefold() in self.family_name.casefold():
+        if "looped" in self.family_name.casefold():
             self.tags |= FontTag.LOOPED
         if self.postscript_name.startswith("NotoSansNotoSansTifinagh"):
             pass
         match = re.match(r"NotoSansTifinagh(?P<variant>.*?)-", self.postscript_name)
         if match is not None:
             self.script_variant = match['variant']
+        # Thousands of fonts share a few hundred of these names, so intern them to share the string objects.
+        self.script_variant = sys.intern(self.script_variant)
+        self.subfamily_name = sys.intern(self.subfamily_name)
+        self.postscript_name = sys.intern(self.postscript_name)
         self.url = url
 
     @property
@@ -227,6 +233,35 @@ def read_font_infos_from_csv(csv_path):
     return font_infos
 
 
+def _str_data_matchers(str_data):
+    '''Returns a tuple of `(member, literal, regex)` matchers for one of the `*_str_data` dicts used by the Enum
+    `from_str()` methods. `literal` is the lowercased text matched by `regex` if `regex` ignores case and matches
+    only that text, otherwise None.
+
+    The matchers are in reverse order, so that the first one that matches gives the same result as the last entry
+    in `str_data` that matches.'''
+    matchers = []
+    for member, (_, regex) in str_data.items():
+        literal = regex.pattern.replace("\\.", ".")
+        if regex.flags & re.IGNORECASE and re.escape(literal) == regex.pattern:
+            literal = literal.lower()
+        else:
+            # Case-sensitive patterns must be matched by the regex itself.
+            literal = None
+        matchers.append((member, literal, regex))
+    return tuple(reversed(matchers))
+
+def _enum_from_str(matchers, string, default):
+    '''Returns the member of the first of `matchers` (from `_str_data_matchers()`) that matches `string`, or
+    `default` if none match. Literal text is found with a substring test, which is much faster than a regex
+    search.'''
+    lower_string = string.lower()
+    for member, literal, regex in matchers:
+        if (literal in lower_string) if literal is not None else regex.search(string):
+            return member
+    return default
+
+
 @functools.total_ordering
 class FontForm(Enum):
     '''Enum of font forms.'''
@@ -246,11 +281,7 @@ class FontForm(Enum):
 
     @classmethod
     def from_str(cls, string: str):
-        result = FontForm.UNSET
-        for font_form, data in font_form_str_data.items():
-            if data[1].search(string):
-                result = font_form
-        return result
+        return _enum_from_str(_font_form_matchers, string, FontForm.UNSET)
     
     def __lt__(self, other):
         if not isinstance(other, type(self)):
@@ -267,6 +298,8 @@ font_form_str_data = {
 }
 '''Data for string conversion to and from `FontForm`.'''
 
+_font_form_matchers = _str_data_matchers(font_form_str_data)
+
 
 @functools.total_ordering
 class FontWidth(Enum):
@@ -287,11 +320,7 @@ class FontWidth(Enum):
 
     @classmethod
     def from_str(cls, string: str):
-        result = FontWidth.NORMAL
-        for font_width, data in font_width_str_data.items():
-            if data[1].search(string):
-                result = font_width
-        return result
+        return _enum_from_str(_font_width_matchers, string, FontWidth.NORMAL)
 
     def __lt__(self, other):
         if not isinstance(other, type(self)):
@@ -307,6 +336,8 @@ font_width_str_data = {
 }
 '''Data for string conversion to and from `FontWidth`.'''
 
+_font_width_matchers = _str_data_matchers(font_width_str_data)
+
 
 @functools.total_ordering
 class FontWeight(Enum):
@@ -329,11 +360,7 @@ class FontWeight(Enum):
 
     @classmethod
     def from_str(cls, string: str):
-        result = FontWeight.REGULAR
-        for font_width, data in font_weight_str_data.items():
-            if data[1].search(string):
-                result = font_width
-        return result
+        return _enum_from_str(_font_weight_matchers, string, FontWeight.REGULAR)
 
     def __lt__(self, other):
         if not isinstance(other, type(self)):
@@ -356,6 +383,8 @@ font_weight_str_data = {
 }
 '''Data for string conversion to and from `FontWeight`.'''
 
+_font_weight_matchers = _str_data_matchers(font_weight_str_data)
+
 
 @functools.total_ordering
 class FontStyle(Enum):
@@ -373,11 +402,7 @@ class FontStyle(Enum):
 
     @classmethod
     def from_str(cls, string: str):
-        result = FontStyle.UPRIGHT
-        for font_style, data in font_style_str_data.items():
-            if data[1].search(string):
-                result = font_style
-        return result
+        return _enum_from_str(_font_style_matchers, string, FontStyle.UPRIGHT)
 
     def __lt__(self, other):
         if not isinstance(other, type(self)):
@@ -390,6 +415,8 @@ font_style_str_data = {
 }
 '''Data for string conversion to and from `FontStyle`.'''
 
+_font_style_matchers = _str_data_matchers(font_style_str_data)
+
 
 @functools.total_ordering
 class FontFormat(Enum):
@@ -405,11 +432,7 @@ class FontFormat(Enum):
 
     @classmethod
     def from_str(cls, string: str):
-        result = FontFormat.UNSET
-        for font_format, data in font_format_str_data.items():
-            if data[1].search(string):
-                result = font_format
-        return result
+        return _enum_from_str(_font_format_matchers, string, FontFormat.UNSET)
 
     def __lt__(self, other):
         if not isinstance(other, type(self)):
@@ -424,6 +447,8 @@ font_format_str_data = {
 }
 '''Data for string conversion to and from `FontFormat`.'''
 
+_font_format_matchers = _str_data_matchers(font_format_str_data)
+
 
 @functools.total_ordering
 class FontBuild(Enum):
@@ -439,11 +464,7 @@ class FontBuild(Enum):
 
     @classmethod
     def from_str(cls, string: str):
-        result = FontBuild.UNSET
-        for font_build, data in font_build_str_data.items():
-            if data[1].search(string):
-                result = font_build
-        return result
+        return _enum_from_str(_font_build_matchers, string, FontBuild.UNSET)
 
     def __lt__(self, other):
         if not isinstance(other, type(self)):
@@ -458,6 +479,8 @@ font_build_str_data = {
 }
 '''Data for string conversion to and from `FontBuild`.'''
 
+_font_build_matchers = _str_data_matchers(font_build_str_data)
+
 
 @functools.total_ordering
 class FontTag(Flag):
@@ -3,13 +3,18 @@ import contextlib
 import filecmp
 import platform
 from pprint import pprint
+import re
+import sys
 import tempfile
 import time
+from urllib.parse import urlparse
 
 import unicodedataplus as udp
 import pytest
 
 from fontfinder import *
+from fontfinder import _unicode
+from fontfinder import model
 
 
 FONT_INSTALL_SLEEP_STEP = 1
@@ -93,6 +98,30 @@ class TestFontFinder:
         # print(len(fonts))
         # pprint(fonts[-10:])
 
+    def test_iter_known_fonts(self):
+        ff = FontFinder()
+        assert list(ff.iter_known_fonts()) == ff.known_fonts()
+        filter_func = attr_in("main_script", ["Arabic"])
+        assert list(ff.iter_known_fonts(filter_func)) == ff.known_fonts(filter_func)
+
+    def test_known_fonts_not_shared(self):
+        ff_1 = FontFinder()
+        ff_2 = FontFinder()
+        font_info_1 = ff_1.find_family_fonts("Noto Naskh Arabic")[0]
+        font_info_1.downloaded_path = Path("Downloaded.ttf")
+        assert ff_1.find_family_fonts("Noto Naskh Arabic")[0].downloaded_path == Path("Downloaded.ttf")
+        assert ff_2.find_family_fonts("Noto Naskh Arabic")[0].downloaded_path == Path()
+        assert FontFinder().find_family_fonts("Noto Naskh Arabic")[0].downloaded_path == Path()
+
+    def test_clear_cache(self):
+        ff = FontFinder()
+        text_info = ff.analyse("繁體中文")
+        font_count = len(ff.known_fonts())
+        FontFinder.clear_cache()
+        ff = FontFinder()
+        assert ff.analyse("繁體中文") == text_info
+        assert len(ff.known_fonts()) == font_count
+
     def test_known_scripts(self):
         ff = FontFinder()
         pprint(ff.known_scripts())
@@ -124,6 +153,71 @@ class TestFontFinder:
             assert sample_text['main_script'] == text_info.main_script
             assert sample_text['script_variant'] == text_info.script_variant
 
+    def test_analyse_ascii(self):
+        ff = FontFinder()
+        text_info = ff.analyse("Hello, World!")
+        assert text_info.main_script == 'Latin'
+        assert text_info.script_variant == ''
+        assert text_info.emoji_count == 0
+        assert list(text_info.script_count.items()) == [('Latin', 10), ('Common', 3)]
+
+        text_info = ff.analyse("(1 + 2) * 3")
+        assert text_info.main_script == ''
+        assert list(text_info.script_count.items()) == [('Common', 11)]
+
+    def test_count_properties(self):
+        # Sample codepoints from across the whole Unicode range, including repeats, in a scrambled order.
+        chars = [chr(codepoint) for codepoint in range(0, sys.maxunicode + 1, 61)]
+        chars += [chr(codepoint) for codepoint in range(0x1F300, 0x1FB00)] + list("Hello, 世界! 😀")
+        chars = chars[::-3] + chars
+        expected_script_count = Counter()
+        expected_emoji_count = 0
+        for char in chars:
+            expected_script_count[udp.script(char)] += 1
+            if udp.is_emoji_presentation(char) or udp.is_extended_pictographic(char):
+                expected_emoji_count += 1
+        script_count, emoji_count = _unicode.count_properties(Counter(chars))
+        assert list(script_count.items()) == list(expected_script_count.items())
+        assert emoji_count == expected_emoji_count
+
+    def test_enum_from_str(self):
+        def last_match_from_str(str_data, string, default):
+            # The original from_str() implementation: the last entry whose regex matches wins.
+            result = default
+            for member, data in str_data.items():
+                if data[1].search(string):
+                    result = member
+            return result
+
+        ff = FontFinder()
+        strings = {urlparse(font_info.url).path for font_info in ff.known_fonts()}
+        strings |= {font_info.family_name for font_info in ff.known_fonts()}
+        strings |= {string.upper() for string in strings} | {string.lower() for string in strings}
+        enum_data = [(FontForm, model.font_form_str_data, FontForm.UNSET),
+                     (FontWidth, model.font_width_str_data, FontWidth.NORMAL),
+                     (FontWeight, model.font_weight_str_data, FontWeight.REGULAR),
+                     (FontStyle, model.font_style_str_data, FontStyle.UPRIGHT),
+                     (FontFormat, model.font_format_str_data, FontFormat.UNSET),
+                     (FontBuild, model.font_build_str_data, FontBuild.UNSET)]
+        for enum_class, str_data, default in enum_data:
+            for string in strings:
+                assert enum_class.from_str(string) == last_match_from_str(str_data, string, default), string
+
+        # Case-sensitive patterns must not be matched case-insensitively
+        str_data = {FontWeight.BOLD: ("Bold", re.compile(r"Bold"))}
+        matchers = model._str_data_matchers(str_data)
+        assert model._enum_from_str(matchers, "NotoSans-Bold.ttf", FontWeight.REGULAR) == FontWeight.BOLD
+        assert model._enum_from_str(matchers, "notosans-bold.ttf", FontWeight.REGULAR) == FontWeight.REGULAR
+
+    def test_analyse_cached(self):
+        ff = FontFinder()
+        text_info = ff.analyse("Hello, World!")
+        text_info.main_script = 'Changed'
+        text_info.script_count['Latin'] = 0
+        text_info = ff.analyse("Hello, World!")
+        assert text_info.main_script == 'Latin'
+        assert text_info.script_count['Latin'] == 10
+
     def test_empty_text(self):
         ff = FontFinder()
         text_info = ff.analyse('')
@@ -150,6 +244,14 @@ class TestFontFinder:
             family_name = ff.find_family(sample_text['text'])
             assert sample_text['expected_family_name'] == family_name
 
+    def test_find_family_prefs_edited_in_place(self):
+        ff = FontFinder()
+        family_names = ["Noto Naskh Arabic"]
+        ff.family_prefs[("Arabic", "")] = [attr_in("family_name", family_names)]
+        assert ff.find_family("مرحبا بالعالم") == "Noto Naskh Arabic"
+        family_names[0] = "Noto Kufi Arabic"
+        assert ff.find_family("مرحبا بالعالم") == "Noto Kufi Arabic"
+
     def test_find_family_fonts(self):
         ff = FontFinder()
         print("Finding family members")